@@ -14,6 +14,7 @@ import torch
 
 from . import path
 from . import basics
+from .counter import Counter
 
 
 class Logger:
@@ -27,7 +28,7 @@ class Logger:
         self._metrics = []
 
     def add(self, mapping, prefix=None):
-        step = int(self.step) * self.multiplier
+        step = self._step_value() * self.multiplier
         for name, value in dict(mapping).items():
             name = f"{prefix}/{name}" if prefix else name
             value = basics.convert(value)
@@ -58,8 +59,20 @@ class Logger:
             output(tuple(self._metrics))
         self._metrics.clear()
 
+    def close(self):
+        for output in self.outputs:
+            if hasattr(output, "close"):
+                output.close()
+
+    def _step_value(self):
+        # Read counters directly instead of dispatching through __int__
+        step = self.step
+        if isinstance(step, Counter):
+            return int(step.value)
+        return int(step)
+
     def _compute_fps(self):
-        step = int(self.step) * self.multiplier
+        step = self._step_value() * self.multiplier
         if self._last_step is None:
             self._last_time = time.time()
             self._last_step = step
@@ -143,6 +156,7 @@ class JSONLOutput(AsyncOutput):
         self._pattern = re.compile(pattern)
         self._logdir = path.Path(logdir)
         self._logdir.mkdirs()
+        self._file = None
 
     def _write(self, summaries):
         bystep = collections.defaultdict(dict)
@@ -155,8 +169,19 @@ class JSONLOutput(AsyncOutput):
                 for step, scalars in bystep.items()
             ]
         )
-        with (self._logdir / self._filename).open("a") as f:
-            f.write(lines)
+        if self._file is None:
+            # Path.open only yields the file inside a with block, so open the
+            # local file directly to keep it across writes
+            self._file = open(str(self._logdir / self._filename), "a")
+        self._file.write(lines)
+        self._file.flush()
+
+    def close(self):
+        if self._parallel:
+            self._future and self._future.result()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 from torch.utils.tensorboard import SummaryWriter
 
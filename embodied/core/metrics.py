@@ -20,23 +20,27 @@ class Metrics:
         self._lasts[key].append(value)
 
     def add(self, mapping, prefix=None):
+        prefix = prefix + "/" if prefix else ""
         for key, value in mapping.items():
-            key = prefix + "/" + key if prefix else key
+            key = prefix + key
             if hasattr(value, "shape") and len(value.shape) > 0:
                 self._lasts[key] = value
             else:
                 self._scalars[key].append(value)
 
     def result(self, reset=True):
-        result = {}
-        result.update(self._lasts)
+        # On reset, hand out the current containers instead of copying them.
+        scalars, result = self._scalars, self._lasts
+        if reset:
+            self.reset()
+        else:
+            result = dict(result)
         with warnings.catch_warnings():  # Ignore empty slice warnings.
             warnings.simplefilter("ignore", category=RuntimeWarning)
-            for key, values in self._scalars.items():
+            for key, values in scalars.items():
                 result[key] = np.nanmean(convert(values), dtype=np.float64)
-        reset and self.reset()
         return result
 
     def reset(self):
-        self._scalars.clear()
-        self._lasts.clear()
+        self._scalars = collections.defaultdict(list)
+        self._lasts = {}
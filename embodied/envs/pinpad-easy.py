@@ -1,4 +1,4 @@
-import collections
+import functools
 
 import embodied
 import numpy as np
@@ -16,6 +16,15 @@ class PinPadEasy(embodied.Env):
         "8": (0, 128, 128),
     }
 
+    # Integer tile IDs used for per-step lookups; pads take consecutive IDs
+    # starting at _PAD_ID in target order
+    _WALL_ID = 0
+    _FLOOR_ID = 1
+    _PAD_ID = 2
+
+    # Position deltas indexed by action: noop, down, up, right, left
+    _MOVES = ((0, 0), (0, 1), (0, -1), (1, 0), (-1, 0))
+
     # Reward modes for experimentation
     # All modes (except sparse and dense_guidance) use longest suffix match pattern:
     # - Score = length of longest buffer suffix that matches target prefix
@@ -31,6 +40,9 @@ class PinPadEasy(embodied.Env):
         "progress_any": "Flat +1.0 per score increase (suffix match pattern)",
     }
 
+    # Modes whose intermediate reward depends only on the sequence position
+    POSITION_REWARD_MODES = ("flat", "progressive", "progressive_steep", "sequence_bonus", "progress_any")
+
     # Dense guidance reward constants (can be tuned)
     DENSE_MOVE_TOWARD_REWARD = 0.1
     DENSE_MOVE_AWAY_PENALTY = 0.05
@@ -40,49 +52,66 @@ class PinPadEasy(embodied.Env):
     def __init__(self, task, length=1000, seed=None, reward_mode="flat"):
         assert length > 0
         assert reward_mode in self.REWARD_MODES, f"Invalid reward_mode: {reward_mode}. Valid modes: {list(self.REWARD_MODES.keys())}"
-        layout = {
-            "three": LAYOUT_THREE,
-            "four": LAYOUT_FOUR,
-            "five": LAYOUT_FIVE,
-            "six": LAYOUT_SIX,
-            "seven": LAYOUT_SEVEN,
-            "eight": LAYOUT_EIGHT,
-        }[task]
-        self.layout = np.array([list(line) for line in layout.split("\n")]).T
-        assert self.layout.shape == (16, 14), self.layout.shape
+        # Layout as characters for display and as tile IDs. The IDs double as
+        # palette indices for render(), and the nested list copy serves
+        # per-step lookups as plain Python ints.
+        self.layout, self._layout_id, self.target = _parse_layout(task)
+        self._tiles = self._layout_id.tolist()
         self.length = length
         self._seed = seed
         self.random = np.random.RandomState(seed)
-        self.pads = set(self.layout.flatten().tolist()) - set("* #\n")
-        self.target = tuple(sorted(self.pads))
-        self.spawns = []
-        # Precompute pad center positions for distance-based rewards
+        self.pads = set(self.target)
+        self.spawns = [tuple(pos) for pos in np.argwhere(self.layout != "#").tolist()]
+        # Precompute pad positions and centers for distance-based rewards
         self.pad_positions = {}
-        for (x, y), char in np.ndenumerate(self.layout):
-            if char != "#":
-                self.spawns.append((x, y))
-            if char in self.pads:
-                if char not in self.pad_positions:
-                    self.pad_positions[char] = []
-                self.pad_positions[char].append((x, y))
-        # Compute center of each pad
         self.pad_centers = {}
-        for pad, positions in self.pad_positions.items():
-            positions = np.array(positions)
-            self.pad_centers[pad] = (positions[:, 0].mean(), positions[:, 1].mean())
+        for pad in self.target:
+            positions = np.argwhere(self.layout == pad)
+            self.pad_positions[pad] = positions
+            self.pad_centers[pad] = tuple(positions.mean(0).tolist())
+        # Inactive pads are drawn faded to white
+        wall, floor = (192, 192, 192), (255, 255, 255)
+        colors = np.array([self.COLORS[pad] for pad in self.target])
+        faded = (10 * colors + 90 * 255) // 100
+        self._palette_active = np.array([wall, floor, *colors], np.uint8)
+        self._palette_dim = np.array([wall, floor, *faded], np.uint8)
+        self._palette_countdown = self._palette_dim.copy()
+        self._palette_countdown[self._FLOOR_ID] = (223, 255, 223)
         self.reward_mode = reward_mode
         print(f'Created PinPadEasy env with sequence: {"->".join(self.target)}, reward_mode: {reward_mode}')
-        self.sequence = collections.deque(maxlen=len(self.target))
+        # The visited-pad buffer holds pad IDs; only the first _seq_len entries
+        # are live
+        n = len(self.target)
+        self._target_ids = tuple(range(self._PAD_ID, self._PAD_ID + n))
+        self._seq_arr = np.zeros(n, np.uint8)
+        self._seq_len = 0
+        # Suffix match score of the current buffer, recomputed only after it changes
+        self._cached_score = 0
+        self._score_dirty = True
+        # Bumped on every buffer change; keys the cached render() frame together
+        # with the player position and countdown state
+        self._seq_version = 0
+        self._render_key = None
+        self._render_image = None
+        # Intermediate rewards of position-only modes, indexed by position - 1
+        self._reward_lut = None
+        if reward_mode in self.POSITION_REWARD_MODES:
+            self._reward_lut = tuple(
+                self._compute_intermediate_reward(None, position) for position in range(1, n + 1)
+            )
         # Track previous sequence score for progress_any mode
         self.prev_sequence_score = 0
         self.player = None
         self.steps = None
         self.done = None
         self.countdown = None
-        # Track tile visits for decaying reward mode
-        self.tile_visits = {tile: 0 for tile in self.pads}
+        # Track tile visits for decaying reward mode, indexed by pad ID offset
+        self._tile_visits = [0] * len(self.target)
         # Position visit tracking for visualization
         self.position_visit_counts = np.zeros((16, 14), dtype=np.int64)
+        # Non-wall cells, fixed by the layout
+        self._valid_mask = self.layout != "#"
+        self._total_valid = int(self._valid_mask.sum())
         # Cache spaces with seed
         self._act_space = {
             "action": embodied.Space(np.int64, (), 0, 5, seed=seed),
@@ -107,40 +136,41 @@ class PinPadEasy(embodied.Env):
     def step(self, action):
         if self.done or action["reset"]:
             self.player = self.spawns[self.random.randint(len(self.spawns))]
-            self.sequence.clear()
+            self._clear_sequence()
             self.prev_sequence_score = 0
             self.steps = 0
             self.done = False
             self.countdown = 0
             # Reset tile visits for decaying mode
-            self.tile_visits = {tile: 0 for tile in self.pads}
+            self._tile_visits[:] = [0] * len(self.target)
             return self._obs(reward=0.0, is_first=True)
         if self.countdown:
             self.countdown -= 1
             if self.countdown == 0:
                 self.player = self.spawns[self.random.randint(len(self.spawns))]
-                self.sequence.clear()
+                self._clear_sequence()
                 self.prev_sequence_score = 0
         
         reward = 0.0
         old_pos = self.player
-        move = [(0, 0), (0, 1), (0, -1), (1, 0), (-1, 0)][action["action"]]
-        x = np.clip(self.player[0] + move[0], 0, 15)
-        y = np.clip(self.player[1] + move[1], 0, 13)
-        tile = self.layout[x][y]
+        dx, dy = self._MOVES[action["action"]]
+        x = max(0, min(15, self.player[0] + dx))
+        y = max(0, min(13, self.player[1] + dy))
+        tile = self._tiles[x][y]
         
-        if tile != "#":
+        if tile != self._WALL_ID:
             self.player = (x, y)
             # Track position visits
             self.position_visit_counts[x, y] += 1
         
         # For dense_guidance mode, compute distance-based rewards
         if self.reward_mode == "dense_guidance":
-            reward += self._compute_dense_guidance_reward(old_pos, self.player, tile)
+            current_score = self._compute_longest_suffix_match()
+            reward += self._compute_dense_guidance_reward(old_pos, self.player, tile, current_score)
         
-        if tile in self.pads:
-            if not self.sequence or self.sequence[-1] != tile:
-                self.sequence.append(tile)
+        if tile >= self._PAD_ID:
+            if not self._seq_len or self._seq_arr[self._seq_len - 1] != tile:
+                self._append_sequence(tile)
                 
                 # Handle different reward modes for tile visits
                 if self.reward_mode == "sparse":
@@ -164,7 +194,12 @@ class PinPadEasy(embodied.Env):
                     
                     self.prev_sequence_score = new_score
         
-        if tuple(self.sequence) == self.target and not self.countdown:
+        # A full-length suffix match means the buffer holds the whole target
+        if (
+            self._seq_len == len(self.target)
+            and self._compute_longest_suffix_match() == self._seq_len
+            and not self.countdown
+        ):
             reward += 10.0
             self.countdown = 10
         self.steps += 1
@@ -182,23 +217,39 @@ class PinPadEasy(embodied.Env):
         Returns:
             int: Length of longest suffix of buffer matching prefix of target
         """
-        if not self.sequence:
-            return 0
-        
-        buffer_list = list(self.sequence)
-        target_list = list(self.target)
-        
+        if not self._score_dirty:
+            return self._cached_score
+        self._score_dirty = False
+        buffer = tuple(self._seq_arr[: self._seq_len].tolist())
+        score = 0
         # Try each suffix of the buffer (from longest to shortest)
-        for suffix_start in range(len(buffer_list)):
-            suffix = buffer_list[suffix_start:]
-            # Check if this suffix matches the beginning of target
-            if len(suffix) <= len(target_list):
-                if suffix == target_list[:len(suffix)]:
-                    return len(suffix)
-        
-        return 0
+        for suffix_start in range(len(buffer)):
+            suffix = buffer[suffix_start:]
+            if suffix == self._target_ids[: len(suffix)]:
+                score = len(suffix)
+                break
+        self._cached_score = score
+        return score
+
+    def _append_sequence(self, pad_id):
+        """Append a pad ID to the buffer, dropping the oldest entry when full."""
+        n = len(self.target)
+        self._score_dirty = True
+        self._seq_version += 1
+        if self._seq_len == n:
+            self._seq_arr[: n - 1] = self._seq_arr[1:n]
+            self._seq_arr[n - 1] = pad_id
+        else:
+            self._seq_arr[self._seq_len] = pad_id
+            self._seq_len += 1
+
+    def _clear_sequence(self):
+        self._seq_arr[: self._seq_len] = 0
+        self._seq_len = 0
+        self._score_dirty = True
+        self._seq_version += 1
 
-    def _compute_dense_guidance_reward(self, old_pos, new_pos, tile):
+    def _compute_dense_guidance_reward(self, old_pos, new_pos, tile, current_score):
         """
         Compute step-wise guidance reward based on movement toward target tile.
         
@@ -208,36 +259,36 @@ class PinPadEasy(embodied.Env):
         Args:
             old_pos: Previous player position
             new_pos: Current player position  
-            tile: The tile at the new position
+            tile: The tile ID at the new position
+            current_score: Longest suffix match score of the current buffer
         
         Returns:
             float: Small positive/negative reward based on movement
         """
         # Use suffix match score to determine the next target tile
         # This is the tile that would extend the current longest suffix match
-        current_score = self._compute_longest_suffix_match()
         next_target_idx = current_score
         
         if next_target_idx >= len(self.target):
             return 0.0  # Already completed
         
-        next_target = self.target[next_target_idx]
-        target_center = self.pad_centers[next_target]
+        next_target = self._PAD_ID + next_target_idx
+        target_center = self.pad_centers[self.target[next_target_idx]]
         
-        # Calculate distances
-        old_dist = np.sqrt((old_pos[0] - target_center[0])**2 + (old_pos[1] - target_center[1])**2)
-        new_dist = np.sqrt((new_pos[0] - target_center[0])**2 + (new_pos[1] - target_center[1])**2)
+        # Squared distances suffice since only their order is compared
+        old_d2 = (old_pos[0] - target_center[0])**2 + (old_pos[1] - target_center[1])**2
+        new_d2 = (new_pos[0] - target_center[0])**2 + (new_pos[1] - target_center[1])**2
         
         reward = 0.0
         
         # Small reward for moving closer to target
-        if new_dist < old_dist:
+        if new_d2 < old_d2:
             reward += self.DENSE_MOVE_TOWARD_REWARD
-        elif new_dist > old_dist:
+        elif new_d2 > old_d2:
             reward -= self.DENSE_MOVE_AWAY_PENALTY
         
         # Penalty for stepping on wrong tile
-        if tile in self.pads and tile != next_target:
+        if tile >= self._PAD_ID and tile != next_target:
             reward -= self.DENSE_WRONG_TILE_PENALTY
         
         # Bonus for reaching the correct target tile
@@ -251,12 +302,15 @@ class PinPadEasy(embodied.Env):
         Compute intermediate reward based on the reward mode.
         
         Args:
-            tile: The tile character that was just reached
+            tile: The ID of the pad that was just reached
             sequence_position: The current position in the sequence (1-indexed)
         
         Returns:
             float: The intermediate reward for reaching this tile
         """
+        if self._reward_lut is not None:
+            return self._reward_lut[sequence_position - 1]
+        
         if self.reward_mode == "flat":
             # Original: flat +1.0 for each correct intermediate tile
             return 1.0
@@ -280,11 +334,12 @@ class PinPadEasy(embodied.Env):
         
         elif self.reward_mode == "decaying":
             # Time-decaying intermediate rewards based on tile visits
-            # First visit (tile_visits[tile]=0): full reward (decay_factor=1.0)
+            # First visit (no previous visits): full reward (decay_factor=1.0)
             # Subsequent visits: decayed reward (decay_factor < 1.0)
             # Increment happens after calculation so first visit gets full reward
-            decay_factor = 1.0 / (1.0 + 0.1 * self.tile_visits[tile])
-            self.tile_visits[tile] += 1
+            pad_index = tile - self._PAD_ID
+            decay_factor = 1.0 / (1.0 + 0.1 * self._tile_visits[pad_index])
+            self._tile_visits[pad_index] += 1
             return 1.0 * decay_factor
         
         elif self.reward_mode == "sparse":
@@ -300,24 +355,25 @@ class PinPadEasy(embodied.Env):
             return 1.0
 
     def render(self):
-        grid = np.zeros((16, 16, 3), np.uint8) + 255
-        white = np.array([255, 255, 255])
-        if self.countdown:
-            grid[:] = (223, 255, 223)
-        current = self.layout[self.player[0]][self.player[1]]
-        for (x, y), char in np.ndenumerate(self.layout):
-            if char == "#":
-                grid[x, y] = (192, 192, 192)
-            elif char in self.pads:
-                color = np.array(self.COLORS[char])
-                color = color if char == current else (10 * color + 90 * white) / 100
-                grid[x, y] = color
+        # The frame only depends on these, so reuse it while the agent stands
+        # still. It is read-only since consecutive observations may share it.
+        key = (self.player, bool(self.countdown), self._seq_version)
+        if key == self._render_key:
+            return self._render_image
+        grid = np.empty((16, 16, 3), np.uint8)
+        palette = self._palette_countdown if self.countdown else self._palette_dim
+        grid[:, :14] = palette[self._layout_id]
+        current = self._layout_id[self.player]
+        if current >= self._PAD_ID:
+            grid[:, :14][self._layout_id == current] = self._palette_active[current]
         grid[self.player] = (0, 0, 0)
         grid[:, -2:] = (192, 192, 192)
-        for i, char in enumerate(self.sequence):
-            grid[2 * i + 1, -2] = self.COLORS[char]
-        image = np.repeat(np.repeat(grid, 4, 0), 4, 1)
-        return image.transpose((1, 0, 2))
+        for i, pad_id in enumerate(self._seq_arr[: self._seq_len]):
+            grid[2 * i + 1, -2] = self._palette_active[pad_id]
+        image = _upscale(grid)
+        image.flags.writeable = False
+        self._render_key, self._render_image = key, image
+        return image
 
     def _obs(self, reward, is_first=False, is_last=False, is_terminal=False):
         return dict(
@@ -334,7 +390,7 @@ class PinPadEasy(embodied.Env):
         Returns a numpy array suitable for logging as an image.
         """
         # Create a normalized heatmap (16x14 grid)
-        visit_counts = self.position_visit_counts.copy().astype(np.float32)
+        visit_counts = self.position_visit_counts.astype(np.float32)
         
         # Avoid division by zero
         max_visits = visit_counts.max()
@@ -345,43 +401,21 @@ class PinPadEasy(embodied.Env):
         
         # Create RGB heatmap (red = high visits, blue = low visits)
         # Use a color gradient from blue (cold/low) to red (hot/high)
-        heatmap = np.zeros((16, 14, 3), dtype=np.uint8)
-        
-        for (x, y), count in np.ndenumerate(normalized_counts):
-            char = self.layout[x, y]
-            if char == "#":
-                # Walls are gray
-                heatmap[x, y] = (192, 192, 192)
-            else:
-                # Color based on visit frequency
-                # Blue (low) -> Green -> Yellow -> Red (high)
-                intensity = normalized_counts[x, y]
-                if intensity < 0.25:
-                    # Blue to Cyan
-                    r = 0
-                    g = int(intensity * 4 * 255)
-                    b = 255
-                elif intensity < 0.5:
-                    # Cyan to Green
-                    r = 0
-                    g = 255
-                    b = int((0.5 - intensity) * 4 * 255)
-                elif intensity < 0.75:
-                    # Green to Yellow
-                    r = int((intensity - 0.5) * 4 * 255)
-                    g = 255
-                    b = 0
-                else:
-                    # Yellow to Red
-                    r = 255
-                    g = int((1.0 - intensity) * 4 * 255)
-                    b = 0
-                heatmap[x, y] = (r, g, b)
-        
-        # Scale up the heatmap for better visibility (4x)
-        heatmap_scaled = np.repeat(np.repeat(heatmap, 4, 0), 4, 1)
-        # Transpose to match render() format
-        return heatmap_scaled.transpose((1, 0, 2))
+        # Blue (low) -> Cyan -> Green -> Yellow -> Red (high)
+        intensity = normalized_counts
+        bands = [intensity < 0.25, intensity < 0.5, intensity < 0.75]
+        rising = (intensity - 0.5) * 4 * 255
+        falling_b = (0.5 - intensity) * 4 * 255
+        falling_g = (1.0 - intensity) * 4 * 255
+        r = np.select(bands, [0, 0, rising], 255)
+        g = np.select(bands, [intensity * 4 * 255, 255, 255], falling_g)
+        b = np.select(bands, [255, falling_b, 0], 0)
+        heatmap = np.stack([r, g, b], -1).astype(np.uint8)
+        # Walls are gray
+        heatmap[self._layout_id == self._WALL_ID] = (192, 192, 192)
+        
+        # Scale up the heatmap for better visibility (4x) in render() format
+        return _upscale(heatmap)
 
     def get_position_stats(self):
         """
@@ -389,12 +423,8 @@ class PinPadEasy(embodied.Env):
         Returns a dictionary with visit statistics.
         """
         # Count only non-wall positions
-        valid_positions = np.zeros_like(self.position_visit_counts, dtype=bool)
-        for (x, y), char in np.ndenumerate(self.layout):
-            valid_positions[x, y] = (char != "#")
-        
-        valid_visits = self.position_visit_counts[valid_positions]
-        total_valid_positions = valid_positions.sum()
+        valid_visits = self.position_visit_counts[self._valid_mask]
+        total_valid_positions = self._total_valid
         visited_positions = (valid_visits > 0).sum()
         
         return {
@@ -407,6 +437,45 @@ class PinPadEasy(embodied.Env):
         }
 
 
+def _upscale(grid, factor=4):
+    """
+    Turn a (width, height, 3) grid into an image with each cell scaled to a
+    factor x factor block and rows first. The upsampling is a broadcast view,
+    so the only copy made is the final image.
+    """
+    width, height, channels = grid.shape
+    blocks = grid.transpose((1, 0, 2))[:, None, :, None, :]
+    blocks = np.broadcast_to(blocks, (height, factor, width, factor, channels))
+    return blocks.reshape(height * factor, width * factor, channels)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_layout(task):
+    """
+    Parse the layout of a task once per process. Returns read-only (16, 14)
+    character and tile ID grids, shared by every env of that task, along
+    with the target pad sequence.
+    """
+    layout = {
+        "three": LAYOUT_THREE,
+        "four": LAYOUT_FOUR,
+        "five": LAYOUT_FIVE,
+        "six": LAYOUT_SIX,
+        "seven": LAYOUT_SEVEN,
+        "eight": LAYOUT_EIGHT,
+    }[task]
+    target = tuple(sorted(set(layout) - set("* #\n")))
+    chars = np.array([list(line) for line in layout.split("\n")]).T
+    assert chars.shape == (16, 14), chars.shape
+    ids = np.full(chars.shape, PinPadEasy._FLOOR_ID, np.uint8)
+    ids[chars == "#"] = PinPadEasy._WALL_ID
+    for i, pad in enumerate(target):
+        ids[chars == pad] = PinPadEasy._PAD_ID + i
+    chars.flags.writeable = False
+    ids.flags.writeable = False
+    return chars, ids, target
+
+
 LAYOUT_THREE = """
 ################
 #1111      3333#
@@ -6,10 +6,19 @@ This script shows how to use debug_subgoal_visualization_shapes()
 in your own debugging scenarios.
 """
 
+from dataclasses import dataclass
+
 import torch
 from hieros.hieros import debug_subgoal_visualization_shapes
 
 
+@dataclass(frozen=True, slots=True)
+class ExampleConfig:
+    """Read-only stand-in for the agent config used by the examples."""
+
+    debug: bool = False
+
+
 def example_basic_usage():
     """
     Basic example of using the debug function.
@@ -174,11 +183,7 @@ def example_integration_pattern():
     print("="*80 + "\n")
     
     # Simulate a config object
-    class Config:
-        def __init__(self, debug=False):
-            self.debug = debug
-    
-    config = Config(debug=True)
+    config = ExampleConfig(debug=True)
     
     print("Code pattern for integration:")
     print("""
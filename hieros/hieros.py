@@ -50,7 +50,9 @@ def debug_subgoal_visualization_shapes(
     
     Args:
         cached_subgoal: The cached subgoal tensor from the subgoal cache
-        subactor_state: The subactor state dict containing 'deter' and 'stoch' keys
+        subactor_state: The subactor state, whose first entry is the latent dict
+            containing 'deter' and 'stoch' keys, or a dict of such tensors stacked
+            along a leading subactor axis
         decoded_subgoal: The decoded subgoal after passing through decode_subgoal
         subgoal_with_time: The decoded subgoal with time dimension added
         state_with_time: The state with time dimension added
@@ -71,8 +73,13 @@ def debug_subgoal_visualization_shapes(
     }
     
     # Get shapes from subactor_state
-    if subactor_state and len(subactor_state) > 0:
+    if isinstance(subactor_state, dict):
+        state_dict = {k: v[0] for k, v in subactor_state.items()}
+    elif subactor_state and len(subactor_state) > 0:
         state_dict = subactor_state[0]
+    else:
+        state_dict = None
+    if state_dict is not None:
         debug_info["subactor_state_keys"] = list(state_dict.keys())
         debug_info["subactor_state_shapes"] = {
             k: list(v.shape) for k, v in state_dict.items()
@@ -84,8 +91,7 @@ def debug_subgoal_visualization_shapes(
     }
     
     # Calculate expected batch size
-    if subactor_state and len(subactor_state) > 0:
-        state_dict = subactor_state[0]
+    if state_dict is not None:
         if len(state_dict) > 0:
             first_value = next(iter(state_dict.values()))
             debug_info["batch_size"] = first_value.shape[0]
@@ -189,6 +195,13 @@ class Hieros(nn.Module):
         # Schedules.
         if config.max_hierarchy == 1:
             config.use_subgoal = False
+        # Resolve per-layer schedules once; every subactor config copies them
+        config.actor_entropy_schedule = tools.layer_schedule(
+            config.actor_entropy, config.max_hierarchy
+        )
+        config.actor_state_entropy_schedule = tools.layer_schedule(
+            config.actor_state_entropy, config.max_hierarchy
+        )
         new_config = copy.deepcopy(config)
         if config.only_subgoal_reward:
             new_config.reward_weight = 0
@@ -531,7 +544,7 @@ class Hieros(nn.Module):
                             }
                             # Decode the compressed subgoal to full representation before computing reward
                             decoded_subgoal = subactor.decode_subgoal(cached_subgoal, isfirst=False)  # [batch, subgoal_features]
-                            subgoal_with_time = decoded_subgoal.unsqueeze(1)  # [batch, subgoal_features] -> [batch, 1, subgoal_features]
+                            subgoal_with_time = decoded_subgoal[:, None, :]  # [batch, subgoal_features] -> [batch, 1, subgoal_features]
                             
                             # Debug logging for tensor shapes (enabled when debug=True in config)
                             if self._config.debug:
@@ -1011,22 +1024,16 @@ class SubActor(nn.Module):
                 "buffering observations is only supported when using a world model"
             )
         
-        # Helper function to get layer-specific value from config
-        def get_layer_value(value, layer_idx):
-            """Get layer-specific value, supporting both single values and lists."""
-            if isinstance(value, (list, tuple)):
-                if len(value) == 0:
-                    raise ValueError("Config list cannot be empty for layer-specific parameters")
-                # Use layer-specific value if list, or last value if list is shorter
-                return value[min(layer_idx, len(value) - 1)]
-            return value
-        
-        # Schedules
-        config.actor_entropy = lambda x=get_layer_value(config.actor_entropy, layer_idx): tools.schedule(
-            x, self._step
+        # Schedules, resolved per layer by Hieros
+        config.actor_entropy = (
+            lambda x=config.actor_entropy_schedule[layer_idx]: tools.schedule(
+                x, self._step
+            )
         )
         config.actor_state_entropy = (
-            lambda x=get_layer_value(config.actor_state_entropy, layer_idx): tools.schedule(x, self._step)
+            lambda x=config.actor_state_entropy_schedule[layer_idx]: tools.schedule(
+                x, self._step
+            )
         )
         config.imag_gradient_mix = lambda x=config.imag_gradient_mix: tools.schedule(
             x, self._step
@@ -956,6 +956,19 @@ def schedule(string, step):
         raise NotImplementedError(string)
 
 
+def layer_schedule(value, num_layers):
+    """Resolve a layer-specific config value into one entry per hierarchy layer.
+
+    A list or tuple gives the value of each layer, with its last entry reused
+    for layers beyond its length. Any other value is shared by all layers.
+    """
+    if isinstance(value, (list, tuple)):
+        if len(value) == 0:
+            raise ValueError("Config list cannot be empty for layer-specific parameters")
+        return tuple(value[min(idx, len(value) - 1)] for idx in range(num_layers))
+    return (value,) * num_layers
+
+
 def weight_init(m):
     if isinstance(m, nn.Linear):
         in_num = m.in_features
@@ -221,6 +221,7 @@ def main(config):
             logger.write()
         else:
             raise NotImplementedError
+    logger.close()
 
     for env in [train_envs]:
         try:
@@ -1,4 +1,3 @@
-#!/usr/bin/env python3
 """
 Simple syntax and structure test for the debug function.
 
@@ -7,193 +6,151 @@ and has the expected structure without requiring all dependencies.
 """
 
 import ast
-import sys
+import functools
+import logging
+import re
+
+import pytest
+
+log = logging.getLogger(__name__)
+
+DEBUG_CALL = "debug_subgoal_visualization_shapes("
+DEBUG_CHECK = "if self._config.debug:"
+DECODE_CALL = "decode_subgoal(cached_subgoal"
+ERROR_MESSAGES = [
+    ("Tensor dimension mismatch detected", "Enhanced error message"),
+    ("To debug, enable debug mode", "Debug suggestion"),
+    ("Common causes:", "Error diagnosis help"),
+]
+SOURCE_PATTERNS = re.compile(
+    "|".join(
+        re.escape(text)
+        for text in [DEBUG_CALL, DEBUG_CHECK, DECODE_CALL] + [text for text, _ in ERROR_MESSAGES]
+    )
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_source():
+    """Read hieros.py once and share the text across tests."""
+    with open("hieros/hieros.py", "r") as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_source():
+    """Parse hieros.py once and share the AST across tests."""
+    return ast.parse(_read_source())
+
+
+@functools.lru_cache(maxsize=None)
+def _source_hits():
+    """Positions of every SOURCE_PATTERNS match in hieros.py, found in one scan."""
+    hits = {}
+    for match in SOURCE_PATTERNS.finditer(_read_source()):
+        hits.setdefault(match.group(), []).append(match.start())
+    return hits
+
+
+def _find_function(tree, name):
+    """Find a module-level function or method by name without walking function bodies."""
+    stack = list(reversed(tree.body))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.FunctionDef) and node.name == name:
+            return node
+        if isinstance(node, ast.ClassDef):
+            stack.extend(reversed(node.body))
+    return None
 
 
 def test_debug_function_exists():
     """Check if the debug function exists in hieros.py."""
-    print("="*80)
-    print("TEST: Checking if debug_subgoal_visualization_shapes exists")
-    print("="*80)
+    log.debug("TEST: Checking if debug_subgoal_visualization_shapes exists")
     
-    with open("hieros/hieros.py", "r") as f:
-        content = f.read()
+    # Find the function
+    node = _find_function(_parse_source(), "debug_subgoal_visualization_shapes")
+    assert node is not None, "Function debug_subgoal_visualization_shapes not found"
+    log.debug("✅ Found function: %s", node.name)
+    
+    # Check parameters
+    expected_params = [
+        "cached_subgoal",
+        "subactor_state", 
+        "decoded_subgoal",
+        "subgoal_with_time",
+        "state_with_time",
+        "subactor_idx",
+        "enable_logging",
+    ]
     
-    # Parse the file
-    try:
-        tree = ast.parse(content)
-    except SyntaxError as e:
-        print(f"❌ FAILED: Syntax error in hieros.py: {e}")
-        return False
+    actual_params = [arg.arg for arg in node.args.args]
+    log.debug("  Parameters: %s", actual_params)
     
-    # Find the function
-    function_found = False
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            if node.name == "debug_subgoal_visualization_shapes":
-                function_found = True
-                print(f"✅ Found function: {node.name}")
-                
-                # Check parameters
-                expected_params = [
-                    "cached_subgoal",
-                    "subactor_state", 
-                    "decoded_subgoal",
-                    "subgoal_with_time",
-                    "state_with_time",
-                    "subactor_idx",
-                    "enable_logging",
-                ]
-                
-                actual_params = [arg.arg for arg in node.args.args]
-                print(f"  Parameters: {actual_params}")
-                
-                missing_params = set(expected_params) - set(actual_params)
-                if missing_params:
-                    print(f"  ⚠️  Missing parameters: {missing_params}")
-                    return False
-                
-                print(f"  ✅ All expected parameters present")
-                
-                # Check if it returns something
-                has_return = False
-                for subnode in ast.walk(node):
-                    if isinstance(subnode, ast.Return):
-                        has_return = True
-                        break
-                
-                if has_return:
-                    print(f"  ✅ Function has return statement")
-                else:
-                    print(f"  ⚠️  Function has no return statement")
-                
-                break
-    
-    if not function_found:
-        print(f"❌ FAILED: Function debug_subgoal_visualization_shapes not found")
-        return False
-    
-    print(f"\n✅ TEST PASSED: Function structure is correct")
-    return True
+    missing_params = set(expected_params) - set(actual_params)
+    assert not missing_params, f"Missing parameters: {missing_params}"
+    log.debug("  ✅ All expected parameters present")
+    
+    # Check if it returns something
+    has_return = False
+    for subnode in ast.walk(node):
+        if isinstance(subnode, ast.Return):
+            has_return = True
+            break
+    
+    if has_return:
+        log.debug("  ✅ Function has return statement")
+    else:
+        log.debug("  ⚠️  Function has no return statement")
+    
+    log.debug("✅ TEST PASSED: Function structure is correct")
 
 
 def test_debug_function_integration():
     """Check if the debug function is called in the right place."""
-    print("\n" + "="*80)
-    print("TEST: Checking if debug function is integrated")
-    print("="*80)
+    log.debug("TEST: Checking if debug function is integrated")
     
-    with open("hieros/hieros.py", "r") as f:
-        content = f.read()
+    hits = _source_hits()
     
     # Check if the function is called with debug config check
-    if "if self._config.debug:" in content and "debug_subgoal_visualization_shapes(" in content:
-        print("✅ Debug function is called with config check")
-        
-        # Count occurrences
-        call_count = content.count("debug_subgoal_visualization_shapes(")
-        print(f"  Found {call_count} call(s) to the debug function")
-        
-        # Check if it's in the right section (near decode_subgoal)
-        decode_section = content.find("decode_subgoal(cached_subgoal")
-        debug_call = content.find("debug_subgoal_visualization_shapes(")
-        
-        if decode_section > 0 and debug_call > decode_section:
-            print(f"  ✅ Debug call is positioned after decode_subgoal call")
-        else:
-            print(f"  ⚠️  Debug call position may be incorrect")
-        
-        print(f"\n✅ TEST PASSED: Integration looks correct")
-        return True
+    assert DEBUG_CHECK in hits and DEBUG_CALL in hits, "Debug function not properly integrated"
+    log.debug("✅ Debug function is called with config check")
+    
+    # Count occurrences
+    call_count = len(hits[DEBUG_CALL])
+    log.debug("  Found %d call(s) to the debug function", call_count)
+    
+    # Check if it's in the right section (near decode_subgoal)
+    decode_section = hits.get(DECODE_CALL, [-1])[0]
+    debug_call = hits[DEBUG_CALL][0]
+    
+    if decode_section > 0 and debug_call > decode_section:
+        log.debug("  ✅ Debug call is positioned after decode_subgoal call")
     else:
-        print(f"❌ FAILED: Debug function not properly integrated")
-        return False
+        log.debug("  ⚠️  Debug call position may be incorrect")
+    
+    log.debug("✅ TEST PASSED: Integration looks correct")
 
 
 def test_enhanced_error_handling():
     """Check if enhanced error handling is present."""
-    print("\n" + "="*80)
-    print("TEST: Checking enhanced error handling")
-    print("="*80)
+    log.debug("TEST: Checking enhanced error handling")
     
-    with open("hieros/hieros.py", "r") as f:
-        content = f.read()
+    hits = _source_hits()
     
     # Check for enhanced error messages
-    checks = [
-        ("Tensor dimension mismatch detected", "Enhanced error message"),
-        ("To debug, enable debug mode", "Debug suggestion"),
-        ("Common causes:", "Error diagnosis help"),
-    ]
-    
-    all_found = True
-    for text, description in checks:
-        if text in content:
-            print(f"  ✅ Found: {description}")
-        else:
-            print(f"  ❌ Missing: {description}")
-            all_found = False
-    
-    if all_found:
-        print(f"\n✅ TEST PASSED: All enhanced error messages present")
-        return True
-    else:
-        print(f"\n❌ TEST FAILED: Some error messages missing")
-        return False
+    missing = [description for text, description in ERROR_MESSAGES if text not in hits]
+    assert not missing, f"Some error messages missing: {missing}"
+    log.debug("✅ TEST PASSED: All enhanced error messages present")
 
 
 def test_file_syntax():
     """Test that the file has valid Python syntax."""
-    print("\n" + "="*80)
-    print("TEST: Checking Python syntax")
-    print("="*80)
+    log.debug("TEST: Checking Python syntax")
     
     try:
-        with open("hieros/hieros.py", "r") as f:
-            content = f.read()
-        ast.parse(content)
-        print("✅ TEST PASSED: Valid Python syntax")
-        return True
+        _parse_source()
     except SyntaxError as e:
-        print(f"❌ TEST FAILED: Syntax error: {e}")
-        return False
-
-
-def main():
-    """Run all tests."""
-    print("\n" + "="*80)
-    print("RUNNING STRUCTURE TESTS FOR DEBUG FUNCTIONALITY")
-    print("="*80)
-    print()
-    
-    results = []
-    
-    # Run all tests
-    results.append(("File syntax", test_file_syntax()))
-    results.append(("Debug function exists", test_debug_function_exists()))
-    results.append(("Debug function integration", test_debug_function_integration()))
-    results.append(("Enhanced error handling", test_enhanced_error_handling()))
-    
-    # Summary
-    print("\n" + "="*80)
-    print("TEST SUMMARY")
-    print("="*80)
-    
-    for name, result in results:
-        status = "✅ PASSED" if result else "❌ FAILED"
-        print(f"{status}: {name}")
-    
-    total = len(results)
-    passed = sum(1 for _, r in results if r)
-    print(f"\nTotal: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("\n🎉 All tests passed!")
-        return 0
-    else:
-        print(f"\n⚠️  {total - passed} test(s) failed")
-        return 1
-
+        pytest.fail(f"Syntax error in hieros.py: {e}")
+    log.debug("✅ TEST PASSED: Valid Python syntax")
 
-if __name__ == "__main__":
-    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Regression tests for the PinPadEasy environment.
+
+These tests pin down the suffix match scores of the visited-pad buffer, the
+rewards of short scripted episodes, and the rendered frames and heatmap.
+
+Usage:
+    pytest test_pinpad_easy.py
+"""
+
+import contextlib
+import importlib.util
+import io
+import itertools
+import pathlib
+
+import numpy as np
+import pytest
+
+# embodied needs torch at import time
+pytest.importorskip("torch")
+
+
+def _load_env_class():
+    # The module name contains a hyphen, so load it from its path
+    path = pathlib.Path(__file__).parent / "embodied" / "envs" / "pinpad-easy.py"
+    spec = importlib.util.spec_from_file_location("pinpad_easy", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.PinPadEasy
+
+
+PinPadEasy = _load_env_class()
+
+
+def make_env(task="three", **kwargs):
+    # The constructor announces the target sequence; keep test output clean
+    with contextlib.redirect_stdout(io.StringIO()):
+        return PinPadEasy(task, **kwargs)
+
+
+def reference_score(buffer, target):
+    """Longest suffix of buffer matching a prefix of target, by brute force."""
+    for length in range(min(len(buffer), len(target)), 0, -1):
+        if tuple(buffer[-length:]) == tuple(target[:length]):
+            return length
+    return 0
+
+
+def fill_buffer(env, pads):
+    """Reset the visited-pad buffer and append the given pad characters."""
+    env._clear_sequence()
+    for pad in pads:
+        env._append_sequence(env._PAD_ID + env.target.index(pad))
+    return env._compute_longest_suffix_match()
+
+
+@pytest.mark.parametrize(
+    "pads, expected",
+    [
+        ("", 0),
+        ("1", 1),
+        ("2", 0),
+        ("12", 2),
+        ("21", 1),
+        ("31", 1),
+        ("23", 0),
+        ("11", 1),
+        ("123", 3),
+        ("312", 2),
+        # The buffer keeps the last three pads: 2, 3, 1
+        ("1231", 1),
+        # The buffer keeps the last three pads: 1, 2, 3
+        ("31123", 3),
+    ],
+)
+def test_suffix_match_examples(pads, expected):
+    env = make_env()
+    assert fill_buffer(env, pads) == expected
+
+
+@pytest.mark.parametrize("task", ["three", "four"])
+def test_suffix_match_matches_reference(task):
+    env = make_env(task)
+    n = len(env.target)
+    # Two pads past capacity covers dropping entries from a full buffer
+    for length in range(n + 3):
+        for pads in itertools.product(env.target, repeat=length):
+            # Only the last n pads are kept in the buffer
+            expected = reference_score(pads[-n:], env.target)
+            assert fill_buffer(env, pads) == expected, pads
+
+
+def test_suffix_match_cache_follows_buffer():
+    env = make_env()
+    assert fill_buffer(env, "12") == 2
+    env._append_sequence(env._PAD_ID + env.target.index("1"))
+    assert env._compute_longest_suffix_match() == 1
+    env._clear_sequence()
+    assert env._compute_longest_suffix_match() == 0
+
+
+def walk_to(env, pad):
+    """Step greedily toward the center of a pad and return the step rewards."""
+    rewards = []
+    cx, cy = env.pad_centers[pad]
+    while env.layout[env.player] != pad:
+        dx, dy = cx - env.player[0], cy - env.player[1]
+        if abs(dx) > abs(dy):
+            action = 3 if dx > 0 else 4
+        else:
+            action = 1 if dy > 0 else 2
+        obs = env.step({"action": action, "reset": False})
+        rewards.append(obs["reward"])
+        assert len(rewards) < 100, "Walk did not reach the pad"
+    return rewards
+
+
+@pytest.mark.parametrize(
+    "reward_mode, expected",
+    [
+        ("flat", [1.0, 1.0, 11.0]),
+        ("progressive", [1.0, 2.0, 14.0]),
+        ("progressive_steep", [1.0, 3.0, 19.0]),
+        ("sequence_bonus", [1.5, 2.0, 12.5]),
+        ("decaying", [1.0, 1.0, 11.0]),
+        ("sparse", [10.0]),
+    ],
+)
+def test_rollout_rewards_and_completion(reward_mode, expected):
+    env = make_env(seed=0, reward_mode=reward_mode)
+    obs = env.step({"action": 0, "reset": True})
+    assert obs["is_first"] and obs["reward"] == 0.0
+    # Start from the open floor in the middle so no pad is crossed on the way
+    env.player = (7, 6)
+
+    rewards = []
+    for pad in env.target:
+        rewards += walk_to(env, pad)
+    assert [reward for reward in rewards if reward] == expected
+    assert env.countdown == 10
+    assert env._compute_longest_suffix_match() == len(env.target)
+
+    # The completion bonus is paid once, while the countdown runs
+    for _ in range(9):
+        obs = env.step({"action": 0, "reset": False})
+        assert obs["reward"] == 0.0
+    # The last countdown step respawns the player with a cleared buffer, which
+    # only holds the pad the player landed on, if any
+    env.step({"action": 0, "reset": False})
+    assert env.countdown == 0
+    assert env._seq_len == (env.layout[env.player] in env.pads)
+
+
+def test_dense_guidance_rewards():
+    env = make_env(seed=0, reward_mode="dense_guidance")
+    env.step({"action": 0, "reset": True})
+    # Just above pad 2, with pad 1 (top left) as the next target
+    env.player = (7, 8)
+
+    def step(action):
+        return env.step({"action": action, "reset": False})["reward"]
+
+    # Landing on a wrong pad while moving away from the target
+    assert step(1) == pytest.approx(-0.15)
+    # Moving toward the target
+    assert step(2) == pytest.approx(0.1)
+    # Moving away from the target
+    assert step(3) == pytest.approx(-0.05)
+    # Standing still
+    assert step(0) == 0.0
+
+    # Every step of the walk moves closer, and the last lands on the target
+    rewards = walk_to(env, "1")
+    assert rewards == pytest.approx([0.1] * (len(rewards) - 1) + [1.1])
+    # The wrong pad before it does not count toward the sequence
+    assert env._compute_longest_suffix_match() == 1
+
+
+def reference_frame(env):
+    """Render the current state cell by cell, as the original renderer did."""
+    grid = np.full((16, 16, 3), 255, np.uint8)
+    white = np.array([255, 255, 255])
+    if env.countdown:
+        grid[:] = (223, 255, 223)
+    current = env.layout[env.player]
+    for (x, y), char in np.ndenumerate(env.layout):
+        if char == "#":
+            grid[x, y] = (192, 192, 192)
+        elif char in env.pads:
+            color = np.array(env.COLORS[char])
+            grid[x, y] = color if char == current else (10 * color + 90 * white) / 100
+    grid[env.player] = (0, 0, 0)
+    grid[:, -2:] = (192, 192, 192)
+    for i, pad_id in enumerate(env._seq_arr[: env._seq_len].tolist()):
+        grid[2 * i + 1, -2] = env.COLORS[env.target[pad_id - env._PAD_ID]]
+    return np.repeat(np.repeat(grid, 4, 0), 4, 1).transpose((1, 0, 2))
+
+
+def pixel(image, x, y):
+    """Color of grid cell (x, y) in a rendered image."""
+    return tuple(image[4 * y, 4 * x].tolist())
+
+
+def test_render_frames():
+    env = make_env(seed=0)
+    env.step({"action": 0, "reset": True})
+    env.player = (7, 6)
+
+    # Right after reset: faded pads, black player, empty sequence bar
+    image = env.render()
+    assert image.shape == (64, 64, 3) and image.dtype == np.uint8
+    np.testing.assert_array_equal(image, reference_frame(env))
+    assert pixel(image, 7, 6) == (0, 0, 0)
+    assert pixel(image, 1, 1) == (255, 229, 229)
+    assert pixel(image, 7, 7) == (255, 255, 255)
+    assert pixel(image, 1, 14) == (192, 192, 192)
+
+    # Standing on an active pad: that pad is drawn in full color and shows
+    # up in the sequence bar
+    walk_to(env, "1")
+    image = env.render()
+    np.testing.assert_array_equal(image, reference_frame(env))
+    assert pixel(image, 1, 1) == env.COLORS["1"]
+    assert pixel(image, 1, 14) == env.COLORS["1"]
+
+    # Walking into a wall leaves the state unchanged and reuses the frame
+    while env.player[0] > 1:
+        env.step({"action": 4, "reset": False})
+    before = env.render()
+    assert env.step({"action": 4, "reset": False})["image"] is before
+    assert not before.flags.writeable
+
+    # Appending a pad produces a new frame
+    walk_to(env, "2")
+    image = env.render()
+    assert image is not before
+    np.testing.assert_array_equal(image, reference_frame(env))
+    assert pixel(image, 3, 14) == env.COLORS["2"]
+
+    # During the countdown the floor is tinted green
+    walk_to(env, "3")
+    assert env.countdown == 10
+    image = env.render()
+    np.testing.assert_array_equal(image, reference_frame(env))
+    assert pixel(image, 7, 6) == (223, 255, 223)
+    assert pixel(image, 5, 14) == env.COLORS["3"]
+
+
+def test_render_cache_tracks_sequence():
+    env = make_env(seed=0)
+    env.step({"action": 0, "reset": True})
+    before = env.render()
+    assert env.render() is before
+    # A buffer change alone, without moving, must produce a new frame
+    env._append_sequence(env._PAD_ID)
+    image = env.render()
+    assert image is not before
+    np.testing.assert_array_equal(image, reference_frame(env))
+
+
+def reference_heatmap(env):
+    """Color the visit counts cell by cell, as the original heatmap did."""
+    counts = env.position_visit_counts.astype(np.float32)
+    counts = counts / counts.max()
+    heatmap = np.zeros((16, 14, 3), np.uint8)
+    for (x, y), intensity in np.ndenumerate(counts):
+        if env.layout[x, y] == "#":
+            heatmap[x, y] = (192, 192, 192)
+        elif intensity < 0.25:
+            heatmap[x, y] = (0, int(intensity * 4 * 255), 255)
+        elif intensity < 0.5:
+            heatmap[x, y] = (0, 255, int((0.5 - intensity) * 4 * 255))
+        elif intensity < 0.75:
+            heatmap[x, y] = (int((intensity - 0.5) * 4 * 255), 255, 0)
+        else:
+            heatmap[x, y] = (255, int((1.0 - intensity) * 4 * 255), 0)
+    return np.repeat(np.repeat(heatmap, 4, 0), 4, 1).transpose((1, 0, 2))
+
+
+def test_position_heatmap():
+    env = make_env()
+    # Counts spanning every color band, with the maximum at (14, 12)
+    env.position_visit_counts[:] = np.arange(16 * 14).reshape(16, 14) % 41
+    env.position_visit_counts[14, 12] = 40
+    heatmap = env.get_position_heatmap()
+    assert heatmap.shape == (56, 64, 3) and heatmap.dtype == np.uint8
+    np.testing.assert_array_equal(heatmap, reference_heatmap(env))
+    assert pixel(heatmap, 14, 12) == (255, 0, 0)
+    assert pixel(heatmap, 0, 0) == (192, 192, 192)